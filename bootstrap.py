@@ -0,0 +1,43 @@
+"""
+Startup data for the in-memory OAuth2 server
+
+Shared by the server (main.py) and the init_db.py script so both seed
+the same admin user and fixed test client from settings.
+"""
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def bootstrap(storage, settings):
+    """Create the admin user and the fixed test client from settings (idempotent)"""
+    admin_status = "exists"
+    if not storage.get_user_by_username(settings.ADMIN_USERNAME):
+        storage.create_user(
+            username=settings.ADMIN_USERNAME,
+            email=settings.ADMIN_EMAIL,
+            password=settings.ADMIN_PASSWORD,
+            full_name="Administrator"
+        )
+        admin_status = "created"
+    
+    # Fixed test client (with environment variable support)
+    client_status = "exists"
+    if not storage.get_client(settings.TEST_CLIENT_ID):
+        storage.create_client(
+            client_id=settings.TEST_CLIENT_ID,
+            client_secret=settings.TEST_CLIENT_SECRET,
+            client_name=settings.TEST_CLIENT_NAME,
+            redirect_uris=settings.TEST_CLIENT_REDIRECT_URIS,
+            scope="openid profile email"
+        )
+        client_status = "created"
+    
+    logger.info(
+        "%s v%s (In-Memory Mode, data is lost on restart) on http://%s:%s - "
+        "admin=%s (%s) test_client=%s (%s) secret=%s redirect_uris=%s",
+        settings.APP_NAME, settings.APP_VERSION, settings.HOST, settings.PORT,
+        settings.ADMIN_USERNAME, admin_status,
+        settings.TEST_CLIENT_ID, client_status, settings.TEST_CLIENT_SECRET,
+        ", ".join(settings.TEST_CLIENT_REDIRECT_URIS),
+    )
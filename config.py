@@ -1,46 +1,81 @@
 """
 Application configuration
 """
+import os
+from dataclasses import dataclass, field
+from functools import lru_cache
+from typing import Tuple
 
 
+def _env(name: str, default: str) -> str:
+    return os.getenv(name, default)
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _available_cpus() -> int:
+    """CPUs this process may run on (respects affinity/cpusets, unlike os.cpu_count())"""
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:  # not available on macOS/Windows
+        return os.cpu_count() or 1
+
+
+def _env_tuple(name: str, default: str) -> Tuple[str, ...]:
+    return tuple(item.strip() for item in os.getenv(name, default).split(","))
+
+
+@dataclass(frozen=True, slots=True)
 class Settings:
-    """Application settings"""
-    
+    """Application settings (environment variables are read once, on creation)"""
+
     # Application
-    APP_NAME = "Solar System OAuth Server"
-    APP_VERSION = "1.0.0 (In-Memory)"
-    DEBUG = False
-    
+    APP_NAME: str = "Solar System OAuth Server"
+    APP_VERSION: str = "1.0.0 (In-Memory)"
+    DEBUG: bool = field(default_factory=lambda: _env("DEBUG", "false").lower() in ("1", "true", "yes"))
+
     # Server
-    HOST = "0.0.0.0"
-    PORT = 8000
-    
+    HOST: str = field(default_factory=lambda: _env("HOST", "0.0.0.0"))
+    PORT: int = field(default_factory=lambda: _env_int("PORT", 8000))
+
     # Security
-    SECRET_KEY = "your-secret-key-change-this-in-production"
-    ALGORITHM = "HS256"
-    
-    # OAuth2 Token expiration (in seconds)
-    ACCESS_TOKEN_EXPIRE_SECONDS = 3600  # 1 hour
-    REFRESH_TOKEN_EXPIRE_DAYS = 30  # 30 days
-    AUTHORIZATION_CODE_EXPIRE_MINUTES = 10  # 10 minutes
-    
+    SECRET_KEY: str = field(default_factory=lambda: _env("SECRET_KEY", "your-secret-key-change-this-in-production"))
+    ALGORITHM: str = "HS256"
+    # Argon2id cost; lower these (e.g. 1 / 1024) only for local test runs
+    ARGON2_TIME_COST: int = field(default_factory=lambda: _env_int("ARGON2_TIME_COST", 3))
+    ARGON2_MEMORY_COST: int = field(default_factory=lambda: _env_int("ARGON2_MEMORY_COST", 65536))  # KiB
+    ARGON2_PARALLELISM: int = field(default_factory=lambda: _env_int("ARGON2_PARALLELISM", max(1, _available_cpus() // 2)))
+    # Concurrent password verifications (each holds an ARGON2_MEMORY_COST buffer)
+    PASSWORD_VERIFY_CONCURRENCY: int = field(default_factory=lambda: _env_int("PASSWORD_VERIFY_CONCURRENCY", _available_cpus()))
+
+    # OAuth2 Token expiration
+    ACCESS_TOKEN_EXPIRE_SECONDS: int = field(default_factory=lambda: _env_int("ACCESS_TOKEN_EXPIRE_SECONDS", 3600))  # 1 hour
+    REFRESH_TOKEN_EXPIRE_DAYS: int = field(default_factory=lambda: _env_int("REFRESH_TOKEN_EXPIRE_DAYS", 30))  # 30 days
+    AUTHORIZATION_CODE_EXPIRE_MINUTES: int = field(default_factory=lambda: _env_int("AUTHORIZATION_CODE_EXPIRE_MINUTES", 10))  # 10 minutes
+
     # CORS
-    CORS_ORIGINS = ["*"]
-    
+    CORS_ORIGINS: Tuple[str, ...] = field(default_factory=lambda: _env_tuple("CORS_ORIGINS", "*"))
+
     # Admin credentials (for initial setup)
-    ADMIN_USERNAME = "admin"
-    ADMIN_PASSWORD = "admin123"
-    ADMIN_EMAIL = "admin@example.com"
-    
+    ADMIN_USERNAME: str = field(default_factory=lambda: _env("ADMIN_USERNAME", "admin"))
+    ADMIN_PASSWORD: str = field(default_factory=lambda: _env("ADMIN_PASSWORD", "admin123"))
+    ADMIN_EMAIL: str = field(default_factory=lambda: _env("ADMIN_EMAIL", "admin@example.com"))
+
     # Fixed test client
-    TEST_CLIENT_ID = "mcp_test_client"
-    TEST_CLIENT_SECRET = "test-secret-change-in-production"
-    TEST_CLIENT_NAME = "MCP Test Client"
-    TEST_CLIENT_REDIRECT_URIS = [
-        "http://localhost:3000/callback",
-        "http://127.0.0.1:3000/callback",
+    TEST_CLIENT_ID: str = field(default_factory=lambda: _env("TEST_CLIENT_ID", "mcp_test_client"))
+    TEST_CLIENT_SECRET: str = field(default_factory=lambda: _env("TEST_CLIENT_SECRET", "test-secret-change-in-production"))
+    TEST_CLIENT_NAME: str = field(default_factory=lambda: _env("TEST_CLIENT_NAME", "MCP Test Client"))
+    TEST_CLIENT_REDIRECT_URIS: Tuple[str, ...] = field(default_factory=lambda: _env_tuple(
+        "TEST_CLIENT_REDIRECT_URIS",
+        "http://localhost:3000/callback,"
+        "http://127.0.0.1:3000/callback,"
         "http://localhost:8080/callback"
-    ]
+    ))
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Return the process-wide settings instance"""
+    return Settings()
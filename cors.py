@@ -0,0 +1,101 @@
+"""
+Lightweight CORS middleware for the default wildcard configuration
+
+Produces the same responses as Starlette's (<1.0) CORSMiddleware with
+allow_origins=["*"], allow_credentials=True, allow_methods=["*"] and
+allow_headers=["*"], but without per-request origin matching or Headers
+rebuilding:
+
+- simple requests get "Access-Control-Allow-Origin: *", and the Origin is
+  echoed back (merged into Vary) only when the request carries a Cookie
+- preflights echo the Origin and requested headers, and reject methods
+  outside _ALLOW_METHODS with a 400
+
+test_cors.py compares both middlewares side by side.
+"""
+
+_ALLOW_METHODS = (b"DELETE", b"GET", b"HEAD", b"OPTIONS", b"PATCH", b"POST", b"PUT")
+
+# Static parts of the preflight response
+_PREFLIGHT_HEADERS = [
+    (b"vary", b"Origin"),
+    (b"access-control-allow-methods", b", ".join(_ALLOW_METHODS)),
+    (b"access-control-max-age", b"600"),
+    (b"access-control-allow-credentials", b"true"),
+]
+
+
+def _set_header(headers, name, value):
+    """Replace every `name` entry with one (name, value), keeping the first position"""
+    found = [i for i, (key, _) in enumerate(headers) if key == name]
+    for i in reversed(found[1:]):
+        del headers[i]
+    if found:
+        headers[found[0]] = (name, value)
+    else:
+        headers.append((name, value))
+
+
+class WildcardCORSMiddleware:
+    """Allow every origin, with credentials"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # First value of each header, as Starlette's Headers.get() would return
+        origin = None
+        request_method = None
+        request_headers = None
+        has_cookie = False
+        for name, value in scope["headers"]:
+            if name == b"origin":
+                if origin is None:
+                    origin = value
+            elif name == b"access-control-request-method":
+                if request_method is None:
+                    request_method = value
+            elif name == b"access-control-request-headers":
+                if request_headers is None:
+                    request_headers = value
+            elif name == b"cookie":
+                has_cookie = True
+
+        # Not a CORS request
+        if origin is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Preflight: answer directly without reaching the app
+        if scope["method"] == "OPTIONS" and request_method is not None:
+            headers = _PREFLIGHT_HEADERS + [(b"access-control-allow-origin", origin)]
+            if request_headers is not None:
+                headers.append((b"access-control-allow-headers", request_headers))
+            if request_method in _ALLOW_METHODS:
+                status, body = 200, b"OK"
+            else:
+                status, body = 400, b"Disallowed CORS method"
+            headers.append((b"content-length", str(len(body)).encode()))
+            headers.append((b"content-type", b"text/plain; charset=utf-8"))
+            await send({"type": "http.response.start", "status": status, "headers": headers})
+            await send({"type": "http.response.body", "body": body})
+            return
+
+        async def send_with_cors(message):
+            if message["type"] == "http.response.start":
+                headers = message["headers"] = list(message.get("headers", []))
+                _set_header(headers, b"access-control-allow-origin", b"*")
+                _set_header(headers, b"access-control-allow-credentials", b"true")
+
+                # A cookie means a credentialed request, which can't use "*"
+                if has_cookie:
+                    _set_header(headers, b"access-control-allow-origin", origin)
+                    vary = next((value for key, value in headers if key == b"vary"), None)
+                    _set_header(headers, b"vary", vary + b", Origin" if vary is not None else b"Origin")
+            await send(message)
+
+        await self.app(scope, receive, send_with_cors)
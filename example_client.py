@@ -5,7 +5,6 @@ This demonstrates how an MCP server would interact with the OAuth server.
 Run this after starting the OAuth server (python main.py).
 """
 import requests
-import webbrowser
 from urllib.parse import urlencode, parse_qs, urlparse
 import secrets
 
@@ -31,6 +30,9 @@ class OAuth2Client:
         
         self.access_token = None
         self.refresh_token = None
+        
+        # Reuse keep-alive connections across token/userinfo calls
+        self._session = requests.Session()
     
     def get_authorization_url(self, scope: str = "openid profile email", state: str = None):
         """Generate authorization URL"""
@@ -58,7 +60,7 @@ class OAuth2Client:
             "client_secret": self.client_secret,
         }
         
-        response = requests.post(self.token_endpoint, data=data)
+        response = self._session.post(self.token_endpoint, data=data)
         response.raise_for_status()
         
         token_data = response.json()
@@ -77,7 +79,7 @@ class OAuth2Client:
             "refresh_token": self.refresh_token,
         }
         
-        response = requests.post(self.token_endpoint, data=data)
+        response = self._session.post(self.token_endpoint, data=data)
         response.raise_for_status()
         
         token_data = response.json()
@@ -95,7 +97,7 @@ class OAuth2Client:
             "Authorization": f"Bearer {self.access_token}"
         }
         
-        response = requests.get(self.userinfo_endpoint, headers=headers)
+        response = self._session.get(self.userinfo_endpoint, headers=headers)
         response.raise_for_status()
         
         return response.json()
@@ -132,6 +134,7 @@ def main():
     print("Please login and authorize the application")
     print("(Use username: admin, password: admin123)")
     print()
+    import webbrowser
     webbrowser.open(auth_url)
     
     # Step 3: Get the redirect URL with code
@@ -3,69 +3,14 @@ In-memory storage initialization script
 
 This script initializes the in-memory storage with:
 1. An admin user
-2. A sample OAuth2 client for testing
+2. The fixed OAuth2 test client (TEST_CLIENT_* settings)
 """
 import sys
 from storage import storage
-from config import settings
-import secrets
+from config import get_settings
+from bootstrap import bootstrap
 
-
-def create_admin_user():
-    """Create admin user"""
-    existing_user = storage.get_user_by_username(settings.ADMIN_USERNAME)
-    
-    if existing_user:
-        print(f"✓ Admin user '{settings.ADMIN_USERNAME}' already exists")
-        return existing_user
-    
-    admin_user = storage.create_user(
-        username=settings.ADMIN_USERNAME,
-        email=settings.ADMIN_EMAIL,
-        password=settings.ADMIN_PASSWORD,
-        full_name="Administrator"
-    )
-    
-    print(f"✓ Created admin user: {settings.ADMIN_USERNAME}")
-    print(f"  Email: {settings.ADMIN_EMAIL}")
-    print(f"  Password: {settings.ADMIN_PASSWORD}")
-    print(f"  ⚠️  CHANGE THE PASSWORD IN PRODUCTION!")
-    
-    return admin_user
-
-
-def create_sample_client():
-    """Create a sample OAuth2 client for testing"""
-    client_id = "mcp_test_client"
-    
-    existing_client = storage.get_client(client_id)
-    
-    if existing_client:
-        print(f"✓ Sample client '{client_id}' already exists")
-        print(f"  Client Secret: {existing_client.client_secret}")
-        return existing_client
-    
-    client_secret = secrets.token_urlsafe(32)
-    
-    client = storage.create_client(
-        client_id=client_id,
-        client_secret=client_secret,
-        client_name="MCP Test Client",
-        redirect_uris=[
-            "http://localhost:3000/callback",
-            "http://127.0.0.1:3000/callback",
-            "http://localhost:8080/callback"
-        ],
-        scope="openid profile email"
-    )
-    
-    print(f"✓ Created sample OAuth2 client:")
-    print(f"  Client ID: {client_id}")
-    print(f"  Client Secret: {client_secret}")
-    print(f"  Redirect URIs: http://localhost:3000/callback, http://127.0.0.1:3000/callback, http://localhost:8080/callback")
-    print(f"  ⚠️  Save these credentials - you'll need them for testing!")
-    
-    return client
+settings = get_settings()
 
 
 def main():
@@ -76,14 +21,20 @@ def main():
     print()
     
     try:
-        # Create admin user
-        print("Setting up admin user...")
-        create_admin_user()
+        print("Setting up admin user and test OAuth2 client...")
+        bootstrap(storage, settings)
+        print()
+        
+        print(f"✓ Admin user: {settings.ADMIN_USERNAME}")
+        print(f"  Email: {settings.ADMIN_EMAIL}")
+        print(f"  Password: {settings.ADMIN_PASSWORD}")
+        print(f"  ⚠️  CHANGE THE PASSWORD IN PRODUCTION!")
         print()
         
-        # Create sample client
-        print("Setting up sample OAuth2 client...")
-        create_sample_client()
+        print(f"✓ Test OAuth2 client:")
+        print(f"  Client ID: {settings.TEST_CLIENT_ID}")
+        print(f"  Client Secret: {settings.TEST_CLIENT_SECRET}")
+        print(f"  Redirect URIs: {', '.join(settings.TEST_CLIENT_REDIRECT_URIS)}")
         print()
         
         print("=" * 60)
@@ -1,91 +1,127 @@
 """
 Main FastAPI application for OAuth2 server (In-Memory version)
 """
-from fastapi import FastAPI, HTTPException, Request, Form, status
-from fastapi.responses import HTMLResponse, RedirectResponse, JSONResponse
+from fastapi import FastAPI, HTTPException, Request, Form
+from fastapi.responses import HTMLResponse, ORJSONResponse, RedirectResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
-import secrets
+from contextlib import asynccontextmanager, suppress
+from functools import lru_cache
+from typing import Annotated, Dict, Tuple
+from urllib.parse import urlencode
+import anyio
+import anyio.to_thread
+import asyncio
 import hashlib
+import hmac
 import base64
-import jwt
-import json
-from datetime import datetime, timedelta
+from jwt.algorithms import get_default_algorithms
+from jwt.utils import base64url_encode
+import orjson
+from pydantic import BaseModel
+import os
+import time
 
-from config import settings
-from storage import storage
+from config import get_settings
+from storage import storage, monotonic_now
+from bootstrap import bootstrap
+from cors import WildcardCORSMiddleware
+from request_clock import RequestClockMiddleware
+
+settings = get_settings()
 
 import logging
 
+logging.basicConfig(level=logging.INFO)
+
 # 모듈 레벨 logger 생성 (권장)
 logger = logging.getLogger(__name__)
 
 
+# /userinfo responses keyed by access token: (monotonic deadline, response)
+_USERINFO_CACHE: Dict[str, Tuple[float, dict]] = {}
+_USERINFO_CACHE_TTL_SECONDS = 60
+_USERINFO_CACHE_MAX_SIZE = 1024
+
+
+# Argon2 verifies get their own worker-thread limit, so they neither starve
+# other threadpool users nor hold more Argon2 memory buffers than usable CPUs
+_ARGON2_LIMITER = anyio.CapacityLimiter(settings.PASSWORD_VERIFY_CONCURRENCY)
+
+
+# How often expired codes and tokens are dropped from storage
+_PURGE_INTERVAL_SECONDS = 60
+
+
+# Seed the in-memory storage eagerly so the first request finds it ready
+bootstrap(storage, settings)
+
+
+async def _purge_expired_periodically():
+    """Background task: drop expired codes/tokens so storage does not grow forever"""
+    while True:
+        await asyncio.sleep(_PURGE_INTERVAL_SECONDS)
+        removed = storage.purge_expired()
+        if removed:
+            logger.info("Purged %d expired codes/tokens", removed)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Application lifespan (data is already bootstrapped at import time)"""
+    purge_task = asyncio.create_task(_purge_expired_periodically())
+    try:
+        yield
+    finally:
+        purge_task.cancel()
+        with suppress(asyncio.CancelledError):
+            await purge_task
+
+
 # Initialize FastAPI app
 app = FastAPI(
     title=settings.APP_NAME,
     version=settings.APP_VERSION,
-    description="OAuth2 server for MCP (Model Context Protocol) authentication - In-Memory Test Version"
+    description="OAuth2 server for MCP (Model Context Protocol) authentication - In-Memory Test Version",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
-# Add CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=settings.CORS_ORIGINS,
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
+# One clock sample per request for all expiry checks
+app.add_middleware(RequestClockMiddleware)
 
-@app.on_event("startup")
-async def startup_event():
-    """Initialize on startup"""
-    print(f"{settings.APP_NAME} v{settings.APP_VERSION} started (In-Memory Mode)")
-    print(f"Server running on http://{settings.HOST}:{settings.PORT}")
-    print("⚠️  데이터는 메모리에만 저장되며, 서버 재시작 시 모두 사라집니다.")
-    
-    # Auto-initialize data on startup (especially for Railway deployment)
-    print("\n🔄 Auto-initializing data...")
-    
-    # Create admin user
-    existing_user = storage.get_user_by_username(settings.ADMIN_USERNAME)
-    if not existing_user:
-        admin_user = storage.create_user(
-            username=settings.ADMIN_USERNAME,
-            email=settings.ADMIN_EMAIL,
-            password=settings.ADMIN_PASSWORD,
-            full_name="Administrator"
-        )
-        print(f"✓ Created admin user: {settings.ADMIN_USERNAME}")
-    else:
-        print(f"✓ Admin user already exists: {settings.ADMIN_USERNAME}")
-    
-    # Create fixed test client (with environment variable support)
-    test_client_id = settings.TEST_CLIENT_ID
-    existing_client = storage.get_client(test_client_id)
-    
-    if not existing_client:
-        client = storage.create_client(
-            client_id=test_client_id,
-            client_secret=settings.TEST_CLIENT_SECRET,
-            client_name=settings.TEST_CLIENT_NAME,
-            redirect_uris=settings.TEST_CLIENT_REDIRECT_URIS,
-            scope="openid profile email"
-        )
-        print(f"✓ Created test client: {test_client_id}")
-        print(f"  Client Secret: {settings.TEST_CLIENT_SECRET}")
-        print(f"  Redirect URIs: {', '.join(settings.TEST_CLIENT_REDIRECT_URIS)}")
-    else:
-        print(f"✓ Test client already exists: {test_client_id}")
-    
-    print("✅ Initialization complete!\n")
+# Add CORS middleware (wildcard origins take the lightweight path)
+if "*" in settings.CORS_ORIGINS:
+    app.add_middleware(WildcardCORSMiddleware)
+else:
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.CORS_ORIGINS,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
 
 
-@app.get("/", response_class=HTMLResponse)
-async def root():
-    """Root endpoint with API information"""
-    return f"""
+def _scope_header(request: Request, name: bytes) -> bytes | None:
+    """First raw value of a (lowercase) header, without building request.headers"""
+    for key, value in request.scope["headers"]:
+        if key == name:
+            return value
+    return None
+
+
+def _request_base_url(request: Request) -> str:
+    """Issuer base URL (scheme://host[/root_path]) read straight from the ASGI scope"""
+    host = _scope_header(request, b"host")
+    if not host:
+        return str(request.base_url).rstrip("/")
+    scope = request.scope
+    return f"{scope['scheme']}://{host.decode('latin-1')}{scope.get('root_path', '')}".rstrip("/")
+
+
+# Pages rendered once at import time; only the authorize form varies per request
+_ROOT_HTML = f"""
     <html>
         <head>
             <title>{settings.APP_NAME}</title>
@@ -134,39 +170,15 @@ async def root():
             </ol>
         </body>
     </html>
-    """
+    """.encode("utf-8")
+_ROOT_ETAG = f'"{hashlib.md5(_ROOT_HTML, usedforsecurity=False).hexdigest()}"'
+_ROOT_ETAG_BYTES = _ROOT_ETAG.encode("ascii")
+_ROOT_CACHE_HEADERS = {"ETag": _ROOT_ETAG, "Cache-Control": "public, max-age=300"}
 
-
-@app.get("/authorize", response_class=HTMLResponse)
-async def authorize(
-    request: Request,
-    client_id: str,
-    redirect_uri: str,
-    response_type: str = "code",
-    scope: Optional[str] = "",
-    state: Optional[str] = None,
-    code_challenge: Optional[str] = None,
-    code_challenge_method: Optional[str] = None,
-):
-    """OAuth2 Authorization Endpoint"""
-    # Validate client
-    client = storage.get_client(client_id)
-    if not client:
-        raise HTTPException(status_code=400, detail="Invalid client_id")
-    
-    # Validate redirect_uri
-    if redirect_uri not in client.redirect_uris:
-        raise HTTPException(status_code=400, detail="Invalid redirect_uri")
-    
-    # Validate response_type
-    if response_type != "code":
-        raise HTTPException(status_code=400, detail="Unsupported response_type")
-    
-    # Return login/consent form
-    return f"""
+_AUTHORIZE_HTML = """
     <html>
         <head>
-            <title>Authorization - {settings.APP_NAME}</title>
+            <title>Authorization - {app_name}</title>
             <style>
                 body {{ 
                     font-family: Arial, sans-serif; 
@@ -218,12 +230,12 @@ async def authorize(
             <div class="container">
                 <h2>🔐 Authorization Required</h2>
                 <div class="client-info">
-                    <strong>{client.client_name}</strong> is requesting access to your account.
+                    <strong>{client_name}</strong> is requesting access to your account.
                 </div>
                 
                 <div class="scope">
                     <strong>Requested permissions:</strong><br>
-                    {scope or "Basic profile information"}
+                    {scope_label}
                 </div>
                 
                 <form method="post" action="/authorize/consent">
@@ -231,9 +243,9 @@ async def authorize(
                     <input type="hidden" name="redirect_uri" value="{redirect_uri}">
                     <input type="hidden" name="response_type" value="{response_type}">
                     <input type="hidden" name="scope" value="{scope}">
-                    <input type="hidden" name="state" value="{state or ''}">
-                    <input type="hidden" name="code_challenge" value="{code_challenge or ''}">
-                    <input type="hidden" name="code_challenge_method" value="{code_challenge_method or ''}">
+                    <input type="hidden" name="state" value="{state}">
+                    <input type="hidden" name="code_challenge" value="{code_challenge}">
+                    <input type="hidden" name="code_challenge_method" value="{code_challenge_method}">
                     
                     <h3>Login</h3>
                     <input type="text" name="username" placeholder="Username" required>
@@ -252,200 +264,301 @@ async def authorize(
     """
 
 
-@app.post("/authorize/consent")
-async def authorize_consent(
-    request: Request,
-    client_id: str = Form(...),
-    redirect_uri: str = Form(...),
-    response_type: str = Form(...),
-    username: str = Form(...),
-    password: str = Form(...),
-    action: str = Form(...),
-    scope: Optional[str] = Form(""),
-    state: Optional[str] = Form(None),
-    code_challenge: Optional[str] = Form(None),
-    code_challenge_method: Optional[str] = Form(None),
+@app.get("/", response_class=HTMLResponse)
+async def root(request: Request):
+    """Root endpoint with API information"""
+    if _scope_header(request, b"if-none-match") == _ROOT_ETAG_BYTES:
+        return Response(status_code=304, headers=_ROOT_CACHE_HEADERS)
+    return HTMLResponse(content=_ROOT_HTML, headers=_ROOT_CACHE_HEADERS)
+
+
+_SUPPORTED_RESPONSE_TYPES = frozenset({"code"})
+
+
+@app.get("/authorize", response_class=HTMLResponse)
+async def authorize(
+    client_id: str,
+    redirect_uri: str,
+    response_type: str = "code",
+    scope: str | None = "",
+    state: str | None = None,
+    code_challenge: str | None = None,
+    code_challenge_method: str | None = None,
 ):
+    """OAuth2 Authorization Endpoint"""
+    # Validate client
+    client = storage.get_client(client_id)
+    if not client:
+        raise HTTPException(status_code=400, detail="Invalid client_id")
+    
+    # Validate redirect_uri
+    if redirect_uri not in client.redirect_uris:
+        raise HTTPException(status_code=400, detail="Invalid redirect_uri")
+    
+    # Validate response_type
+    if response_type not in _SUPPORTED_RESPONSE_TYPES:
+        raise HTTPException(status_code=400, detail="Unsupported response_type")
+    
+    # Return login/consent form
+    return _AUTHORIZE_HTML.format(
+        app_name=settings.APP_NAME,
+        client_name=client.client_name,
+        scope_label=scope or "Basic profile information",
+        client_id=client_id,
+        redirect_uri=redirect_uri,
+        response_type=response_type,
+        scope=scope,
+        state=state or "",
+        code_challenge=code_challenge or "",
+        code_challenge_method=code_challenge_method or "",
+    )
+
+
+# id_token signing: algorithm object, prepared key and encoded header are built once
+_JWT_ALGORITHM = get_default_algorithms()[settings.ALGORITHM]
+_JWT_KEY = _JWT_ALGORITHM.prepare_key(settings.SECRET_KEY)
+_JWT_HEADER = base64url_encode(orjson.dumps({"alg": settings.ALGORITHM, "typ": "JWT"}))
+
+
+def _encode_jwt(claims_json: bytes) -> str:
+    """Sign already-serialized JWT claims with the prepared key"""
+    signing_input = _JWT_HEADER + b"." + base64url_encode(claims_json)
+    signature = _JWT_ALGORITHM.sign(signing_input, _JWT_KEY)
+    return (signing_input + b"." + base64url_encode(signature)).decode("ascii")
+
+
+@lru_cache(maxsize=256)
+def _id_token_static_claims(issuer: str, audience: str, email: str, name: str) -> bytes:
+    """Serialized id_token claims that repeat across logins, without the closing brace"""
+    return orjson.dumps({"iss": issuer, "aud": audience, "email": email, "name": name})[:-1]
+
+
+# Form models are parsed on the event loop (a dataclass dependency would be
+# built in the threadpool, queueing behind Argon2 verifies)
+class ConsentForm(BaseModel):
+    """Form fields posted by the authorize page"""
+    client_id: str
+    redirect_uri: str
+    response_type: str
+    username: str
+    password: str
+    action: str
+    scope: str | None = ""
+    state: str | None = None
+    code_challenge: str | None = None
+    code_challenge_method: str | None = None
+
+
+class TokenForm(BaseModel):
+    """Form fields accepted by the token endpoint"""
+    grant_type: str
+    code: str | None = None
+    redirect_uri: str | None = None
+    client_id: str | None = None
+    client_secret: str | None = None
+    refresh_token: str | None = None
+    code_verifier: str | None = None
+
+
+# Static part of the denial redirect query
+_DENIAL_QUERY = urlencode({"error": "access_denied", "error_description": "User denied authorization"})
+
+
+def _redirect(url: str) -> RedirectResponse:
+    """303 See Other: the browser follows with a GET instead of re-posting the form"""
+    return RedirectResponse(url, status_code=303)
+
+
+@app.post("/authorize/consent")
+async def authorize_consent(form: Annotated[ConsentForm, Form()]):
     """Handle authorization consent"""
+    # Validate client and redirect_uri before redirecting anywhere
+    client = storage.get_client(form.client_id)
+    if not client:
+        raise HTTPException(status_code=400, detail="Invalid client_id")
+    if form.redirect_uri not in client.redirect_uris:
+        raise HTTPException(status_code=400, detail="Invalid redirect_uri")
+    
     # Check if user denied
-    if action == "deny":
-        error_params = f"error=access_denied&error_description=User+denied+authorization"
-        if state:
-            error_params += f"&state={state}"
-        return RedirectResponse(url=f"{redirect_uri}?{error_params}")
+    if form.action == "deny":
+        query = _DENIAL_QUERY
+        if form.state:
+            query += "&" + urlencode({"state": form.state})
+        return _redirect(f"{form.redirect_uri}?{query}")
     
     # Authenticate user
-    user = storage.get_user_by_username(username)
-    if not user or not user.verify_password(password):
+    user = storage.get_user_by_username(form.username)
+    if not user or not await anyio.to_thread.run_sync(
+        user.verify_password, form.password, limiter=_ARGON2_LIMITER
+    ):
         raise HTTPException(status_code=400, detail="Invalid credentials")
     
-    # Validate client
-    client = storage.get_client(client_id)
-    if not client:
-        raise HTTPException(status_code=400, detail="Invalid client_id")
-    
     # Generate authorization code
     auth_code = storage.create_authorization_code(
-        client_id=client_id,
+        client_id=form.client_id,
         user_id=user.id,
-        redirect_uri=redirect_uri,
-        scope=scope,
+        redirect_uri=form.redirect_uri,
+        scope=form.scope,
         expires_in_minutes=settings.AUTHORIZATION_CODE_EXPIRE_MINUTES,
-        code_challenge=code_challenge,
-        code_challenge_method=code_challenge_method
+        code_challenge=form.code_challenge,
+        code_challenge_method=form.code_challenge_method
     )
     
     # Redirect back to client with code
-    callback_params = f"code={auth_code.code}"
-    if state:
-        callback_params += f"&state={state}"
+    callback_params = {"code": auth_code.code}
+    if form.state:
+        callback_params["state"] = form.state
     
-    return RedirectResponse(url=f"{redirect_uri}?{callback_params}")
+    return _redirect(f"{form.redirect_uri}?{urlencode(callback_params)}")
 
 
-@app.post("/token")
-async def token(
-    request: Request,
-    grant_type: str = Form(...),
-    code: Optional[str] = Form(None),
-    redirect_uri: Optional[str] = Form(None),
-    client_id: Optional[str] = Form(None),
-    client_secret: Optional[str] = Form(None),
-    refresh_token: Optional[str] = Form(None),
-    code_verifier: Optional[str] = Form(None),
-):
-    """OAuth2 Token Endpoint"""
-    # Authorization Code Grant
-    if grant_type == "authorization_code":
-        if not code or not redirect_uri or not client_id:
-            raise HTTPException(status_code=400, detail="Missing required parameters")
-        
-        # Validate client
-        client = storage.get_client(client_id)
-        if not client:
-            raise HTTPException(status_code=400, detail="Invalid client")
-        
-        # Verify client secret (if not a public client)
-        if client.client_secret and client.client_secret != client_secret:
-            raise HTTPException(status_code=401, detail="Invalid client credentials")
-        
-        # Validate authorization code
-        auth_code = storage.get_authorization_code(code)
-        
-        if not auth_code or auth_code.client_id != client_id:
-            raise HTTPException(status_code=400, detail="Invalid authorization code")
-        
-        if auth_code.redirect_uri != redirect_uri:
-            raise HTTPException(status_code=400, detail="Redirect URI mismatch")
-        
-        # PKCE verification
-        if auth_code.code_challenge:
-            if not code_verifier:
-                raise HTTPException(status_code=400, detail="code_verifier required")
-            
-            # Verify code_challenge
-            if auth_code.code_challenge_method == "S256":
-                # SHA256 hash
-                verifier_hash = hashlib.sha256(code_verifier.encode()).digest()
-                verifier_challenge = base64.urlsafe_b64encode(verifier_hash).decode().rstrip('=')
-                if verifier_challenge != auth_code.code_challenge:
-                    raise HTTPException(status_code=400, detail="Invalid code_verifier")
-            elif auth_code.code_challenge_method == "plain":
-                if code_verifier != auth_code.code_challenge:
-                    raise HTTPException(status_code=400, detail="Invalid code_verifier")
-            else:
-                raise HTTPException(status_code=400, detail="Unsupported code_challenge_method")
-        
-        # Mark code as used
-        storage.mark_code_as_used(code)
-        
-        # Get user info for ID token
-        user = storage.get_user_by_id(auth_code.user_id)
-        if not user:
-            raise HTTPException(status_code=404, detail="User not found")
-        
-        # Generate tokens
-        token_obj = storage.create_token(
-            client_id=client_id,
-            user_id=auth_code.user_id,
-            scope=auth_code.scope,
-            expires_in_seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS,
-            include_refresh_token=True
-        )
-        
-        # Generate ID token if openid scope is requested
-        response = {
-            "access_token": token_obj.access_token,
-            "token_type": "Bearer",
-            "expires_in": settings.ACCESS_TOKEN_EXPIRE_SECONDS,
-            "refresh_token": token_obj.refresh_token,
-            "scope": auth_code.scope,
-        }
-        
-        if "openid" in auth_code.scope:
-            base_url = str(request.base_url).rstrip("/")
-            id_token_payload = {
-                "iss": base_url,
-                "sub": str(user.id),
-                "aud": client_id,
-                "exp": int((datetime.utcnow() + timedelta(seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS)).timestamp()),
-                "iat": int(datetime.utcnow().timestamp()),
-                "email": user.email,
-                "name": user.full_name,
-            }
-            id_token = jwt.encode(id_token_payload, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
-            response["id_token"] = id_token
-        
-        return response
+async def _grant_authorization_code(request: Request, form: TokenForm) -> dict:
+    """Authorization Code Grant"""
+    if not form.code or not form.redirect_uri or not form.client_id:
+        raise HTTPException(status_code=400, detail="Missing required parameters")
     
-    # Refresh Token Grant
-    elif grant_type == "refresh_token":
-        if not refresh_token:
-            raise HTTPException(status_code=400, detail="Missing refresh_token")
-        
-        # Validate refresh token
-        token_obj = storage.get_token_by_refresh(refresh_token)
-        
-        if not token_obj:
-            raise HTTPException(status_code=400, detail="Invalid or expired refresh token")
-        
-        # Revoke old token
-        storage.revoke_token(token_obj)
+    # Validate client
+    client = storage.get_client(form.client_id)
+    if not client:
+        raise HTTPException(status_code=400, detail="Invalid client")
+    
+    # Verify client secret (if not a public client)
+    if client.client_secret and not hmac.compare_digest(
+        client.client_secret.encode(), (form.client_secret or "").encode()
+    ):
+        raise HTTPException(status_code=401, detail="Invalid client credentials")
+    
+    # Validate and consume the authorization code in one step
+    auth_code = storage.consume_authorization_code(form.code)
+    
+    if not auth_code or auth_code.client_id != form.client_id:
+        raise HTTPException(status_code=400, detail="Invalid authorization code")
+    
+    if auth_code.redirect_uri != form.redirect_uri:
+        raise HTTPException(status_code=400, detail="Redirect URI mismatch")
+    
+    # PKCE verification
+    if auth_code.code_challenge:
+        if not form.code_verifier:
+            raise HTTPException(status_code=400, detail="code_verifier required")
         
-        # Generate new tokens
-        new_token_obj = storage.create_token(
-            client_id=token_obj.client_id,
-            user_id=token_obj.user_id,
-            scope=token_obj.scope,
-            expires_in_seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS,
-            include_refresh_token=True
+        # Verify code_challenge
+        if auth_code.code_challenge_method == "S256":
+            # base64url(SHA256(verifier)); a 32-byte digest always ends in exactly one "="
+            verifier_hash = hashlib.sha256(form.code_verifier.encode()).digest()
+            verifier_challenge = base64.urlsafe_b64encode(verifier_hash)[:-1]
+            if not hmac.compare_digest(verifier_challenge, auth_code.code_challenge.encode()):
+                raise HTTPException(status_code=400, detail="Invalid code_verifier")
+        elif auth_code.code_challenge_method == "plain":
+            if not hmac.compare_digest(form.code_verifier.encode(), auth_code.code_challenge.encode()):
+                raise HTTPException(status_code=400, detail="Invalid code_verifier")
+        else:
+            raise HTTPException(status_code=400, detail="Unsupported code_challenge_method")
+    
+    # Get user info for ID token
+    user = storage.get_user_by_id(auth_code.user_id)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    
+    # Generate tokens
+    token_obj = storage.create_token(
+        client_id=form.client_id,
+        user_id=auth_code.user_id,
+        scope=auth_code.scope,
+        expires_in_seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS,
+        include_refresh_token=True
+    )
+    
+    # Generate ID token if openid scope is requested
+    response = {
+        "access_token": token_obj.access_token,
+        "token_type": token_obj.token_type,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_SECONDS,
+        "refresh_token": token_obj.refresh_token,
+        "scope": auth_code.scope,
+    }
+    
+    if "openid" in auth_code.scope:
+        base_url = _request_base_url(request)
+        now = int(time.time())
+        claims_json = _id_token_static_claims(
+            base_url, form.client_id, user.email, user.full_name
+        ) + b',"sub":"%d","exp":%d,"iat":%d}' % (
+            user.id, now + settings.ACCESS_TOKEN_EXPIRE_SECONDS, now
         )
-        
-        return {
-            "access_token": new_token_obj.access_token,
-            "token_type": "Bearer",
-            "expires_in": settings.ACCESS_TOKEN_EXPIRE_SECONDS,
-            "refresh_token": new_token_obj.refresh_token,
-            "scope": token_obj.scope,
-        }
+        response["id_token"] = _encode_jwt(claims_json)
+    
+    return response
+
+
+async def _grant_refresh_token(request: Request, form: TokenForm) -> dict:
+    """Refresh Token Grant"""
+    if not form.refresh_token:
+        raise HTTPException(status_code=400, detail="Missing refresh_token")
+    
+    # Validate and consume the refresh token in one step
+    token_obj = storage.pop_refresh_token(form.refresh_token)
+    
+    if not token_obj:
+        raise HTTPException(status_code=400, detail="Invalid or expired refresh token")
+    
+    # Revoke old token
+    storage.revoke_token(token_obj)
+    _USERINFO_CACHE.pop(token_obj.access_token, None)
     
-    else:
+    # Generate new tokens
+    new_token_obj = storage.create_token(
+        client_id=token_obj.client_id,
+        user_id=token_obj.user_id,
+        scope=token_obj.scope,
+        expires_in_seconds=settings.ACCESS_TOKEN_EXPIRE_SECONDS,
+        include_refresh_token=True
+    )
+    
+    return {
+        "access_token": new_token_obj.access_token,
+        "token_type": new_token_obj.token_type,
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_SECONDS,
+        "refresh_token": new_token_obj.refresh_token,
+        "scope": token_obj.scope,
+    }
+
+
+_GRANT_HANDLERS = {
+    "authorization_code": _grant_authorization_code,
+    "refresh_token": _grant_refresh_token,
+}
+
+
+@app.post("/token")
+async def token(request: Request, form: Annotated[TokenForm, Form()]):
+    """OAuth2 Token Endpoint"""
+    handler = _GRANT_HANDLERS.get(form.grant_type)
+    if handler is None:
         raise HTTPException(status_code=400, detail="Unsupported grant_type")
+    return await handler(request, form)
 
 
 @app.get("/userinfo")
 async def userinfo(request: Request):
     """Get user information from access token"""
-    # Get access token from Authorization header
-    authorization = request.headers.get("Authorization")
-    if not authorization or not authorization.startswith("Bearer "):
+    # Get access token from the raw Authorization header
+    authorization = _scope_header(request, b"authorization")
+    if not authorization or not authorization.startswith(b"Bearer "):
         raise HTTPException(status_code=401, detail="Missing or invalid authorization header")
     
-    access_token = authorization.replace("Bearer ", "")
+    access_token = authorization[7:].decode("latin-1")
+    
+    # Serve repeated lookups for the same token from the cache
+    now = monotonic_now()
+    cached = _USERINFO_CACHE.get(access_token)
+    if cached and cached[0] > now:
+        return cached[1]
     
     # Validate token
-    token_obj = storage.get_token(access_token)
+    token_obj = storage.get_token(access_token, now)
     if not token_obj:
+        _USERINFO_CACHE.pop(access_token, None)
         raise HTTPException(status_code=401, detail="Invalid or expired token")
     
     # Get user
@@ -453,32 +566,47 @@ async def userinfo(request: Request):
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     
-    return {
+    response = {
         "sub": str(user.id),
         "username": user.username,
         "email": user.email,
         "full_name": user.full_name,
     }
+    
+    # Never cache past the token's own expiry
+    if len(_USERINFO_CACHE) >= _USERINFO_CACHE_MAX_SIZE:
+        _USERINFO_CACHE.pop(next(iter(_USERINFO_CACHE)))
+    _USERINFO_CACHE[access_token] = (
+        min(now + _USERINFO_CACHE_TTL_SECONDS, token_obj.access_token_expires_at), response
+    )
+    
+    return response
+
+
+def _generate_client_credentials() -> Tuple[str, str]:
+    """Generate a client_id/client_secret pair from a single urandom read"""
+    raw = os.urandom(16 + 32)
+    client_id = "client_" + base64.urlsafe_b64encode(raw[:16]).rstrip(b"=").decode("ascii")
+    client_secret = base64.urlsafe_b64encode(raw[16:]).rstrip(b"=").decode("ascii")
+    return client_id, client_secret
 
 
 @app.post("/register-client")
 async def register_client(
-    request: Request,
     client_name: str = Form(...),
     redirect_uris: str = Form(...),  # Comma-separated URIs
-    grant_types: Optional[str] = Form("authorization_code,refresh_token"),
-    scope: Optional[str] = Form("openid profile email"),
+    grant_types: str | None = Form("authorization_code,refresh_token"),
+    scope: str | None = Form("openid profile email"),
 ):
     """Register a new OAuth2 client"""
     # Generate client credentials
-    client_id = f"client_{secrets.token_urlsafe(16)}"
-    client_secret = secrets.token_urlsafe(32)
+    client_id, client_secret = _generate_client_credentials()
     
     # Parse redirect URIs
     uri_list = [uri.strip() for uri in redirect_uris.split(",")]
     
     # Create client
-    client = storage.create_client(
+    storage.create_client(
         client_id=client_id,
         client_secret=client_secret,
         client_name=client_name,
@@ -502,9 +630,9 @@ async def dynamic_client_registration(request: Request):
     Allows clients (like ChatGPT) to dynamically register themselves
     """
     try:
-        # Parse JSON request body
-        body = await request.json()
-    except Exception:
+        # Parse the raw body bytes directly (no intermediate str)
+        body = orjson.loads(await request.body())
+    except orjson.JSONDecodeError:
         raise HTTPException(
             status_code=400,
             detail="Invalid JSON in request body"
@@ -515,7 +643,11 @@ async def dynamic_client_registration(request: Request):
     redirect_uris = body.get("redirect_uris", [])
     
     # Validate redirect URIs
-    if not redirect_uris or not isinstance(redirect_uris, list):
+    if (
+        not redirect_uris
+        or not isinstance(redirect_uris, list)
+        or not all(isinstance(uri, str) for uri in redirect_uris)
+    ):
         raise HTTPException(
             status_code=400,
             detail="redirect_uris is required and must be a non-empty array"
@@ -528,8 +660,7 @@ async def dynamic_client_registration(request: Request):
     token_endpoint_auth_method = body.get("token_endpoint_auth_method", "client_secret_basic")
     
     # Generate client credentials
-    client_id = f"client_{secrets.token_urlsafe(16)}"
-    client_secret = secrets.token_urlsafe(32)
+    client_id, client_secret = _generate_client_credentials()
     
     # Create client in storage
     client = storage.create_client(
@@ -544,7 +675,7 @@ async def dynamic_client_registration(request: Request):
     return {
         "client_id": client_id,
         "client_secret": client_secret,
-        "client_id_issued_at": int(datetime.utcnow().timestamp()),
+        "client_id_issued_at": int(client.created_at),
         "client_secret_expires_at": 0,  # 0 means it doesn't expire
         "client_name": client_name,
         "redirect_uris": redirect_uris,
@@ -555,34 +686,33 @@ async def dynamic_client_registration(request: Request):
     }
 
 
+# JSON Web Key Set, derived from SECRET_KEY once at import time
+# (in production, use proper RSA keys)
+_JWKS_JSON = orjson.dumps({
+    "keys": [
+        {
+            "kty": "oct",  # Symmetric key type
+            "kid": hashlib.sha256(settings.SECRET_KEY.encode()).hexdigest()[:16],
+            "use": "sig",
+            "alg": "HS256",
+            "k": base64.urlsafe_b64encode(settings.SECRET_KEY.encode()).decode().rstrip("=")
+        }
+    ]
+})
+
+
 @app.get("/.well-known/jwks.json")
 async def jwks():
     """JSON Web Key Set (JWKS) endpoint for token verification"""
-    # Generate a simple JWK from the secret key
-    # In production, use proper RSA keys
-    key_id = hashlib.sha256(settings.SECRET_KEY.encode()).hexdigest()[:16]
-    
-    return {
-        "keys": [
-            {
-                "kty": "oct",  # Symmetric key type
-                "kid": key_id,
-                "use": "sig",
-                "alg": "HS256",
-                "k": base64.urlsafe_b64encode(settings.SECRET_KEY.encode()).decode().rstrip("=")
-            }
-        ]
-    }
+    return Response(content=_JWKS_JSON, media_type="application/json")
 
 
-@app.get("/.well-known/oauth-authorization-server")
-async def oauth_metadata(request: Request):
-    """OAuth 2.0 Authorization Server Metadata"""
-    base_url = str(request.base_url).rstrip("/")
+@lru_cache(maxsize=8)
+def _oauth_metadata_json(base_url: str) -> bytes:
+    """Serialized OAuth metadata for a given issuer base URL"""
+    logger.info("OAuth metadata: %s", base_url)
 
-    logger.info(f"OAuth metadata: {base_url}")
-
-    return {
+    return orjson.dumps({
         "issuer": base_url,
         "authorization_endpoint": f"{base_url}/authorize",
         "token_endpoint": f"{base_url}/token",
@@ -596,9 +726,18 @@ async def oauth_metadata(request: Request):
         "scopes_supported": ["openid", "profile", "email"],
         "subject_types_supported": ["public"],
         "id_token_signing_alg_values_supported": ["HS256"],
-    }
+    })
+
+
+@app.get("/.well-known/oauth-authorization-server")
+async def oauth_metadata(request: Request):
+    """OAuth 2.0 Authorization Server Metadata"""
+    return Response(content=_oauth_metadata_json(_request_base_url(request)), media_type="application/json")
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host=settings.HOST, port=settings.PORT)
\ No newline at end of file
+    # loop/http stay on "auto" (uvloop + httptools when installed) so this
+    # also runs where uvloop is unavailable; one worker because all state
+    # lives in this process's memory
+    uvicorn.run(app, host=settings.HOST, port=settings.PORT, access_log=False)
\ No newline at end of file
@@ -0,0 +1,27 @@
+"""
+Per-request clock middleware
+
+Samples time.monotonic() once per HTTP request into storage.request_now,
+so every expiry check made while handling the request sees the same instant.
+"""
+import time
+
+from storage import request_now
+
+
+class RequestClockMiddleware:
+    """Set storage.request_now for the duration of each HTTP request"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        token = request_now.set(time.monotonic())
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            request_now.reset(token)
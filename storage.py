@@ -2,16 +2,53 @@
 In-memory storage for OAuth2 server
 Simple dictionary-based storage for testing purposes
 """
-from datetime import datetime, timedelta
-from typing import Optional, Dict, List
-from passlib.context import CryptContext
+from contextvars import ContextVar
+from typing import Optional, Dict, Iterable, List, Tuple
+from argon2 import PasswordHasher, Type
+from argon2.exceptions import InvalidHash, VerificationError
+import base64
+import heapq
+import os
 import secrets
+import sys
+import time
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from config import get_settings
+
+# Shared, immutable defaults assigned by reference to every instance
+_DEFAULT_GRANT_TYPES = ("authorization_code", "refresh_token")
+_DEFAULT_RESPONSE_TYPES = ("code",)
+_BEARER = sys.intern("Bearer")
+
+# time.monotonic() sampled once per HTTP request (set by the app's middleware)
+request_now: ContextVar[Optional[float]] = ContextVar("request_now", default=None)
+
+
+def monotonic_now() -> float:
+    """The current request's clock sample, or a fresh time.monotonic() outside a request"""
+    now = request_now.get()
+    return time.monotonic() if now is None else now
+
+
+def _urlsafe(raw: bytes) -> str:
+    """Unpadded base64url text, as secrets.token_urlsafe() produces"""
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+# Single shared Argon2id hasher; raise ARGON2_TIME_COST until a verify takes
+# ~50-100 ms on the deployment machine
+password_hasher = PasswordHasher(
+    time_cost=get_settings().ARGON2_TIME_COST,
+    memory_cost=get_settings().ARGON2_MEMORY_COST,  # KiB
+    parallelism=get_settings().ARGON2_PARALLELISM,
+    type=Type.ID,
+)
 
 
 class User:
     """User model"""
+    __slots__ = ("id", "username", "email", "hashed_password", "full_name", "is_active", "created_at")
+    
     def __init__(self, user_id: int, username: str, email: str, hashed_password: str, full_name: str = ""):
         self.id = user_id
         self.username = username
@@ -19,38 +56,46 @@ class User:
         self.hashed_password = hashed_password
         self.full_name = full_name
         self.is_active = True
-        self.created_at = datetime.utcnow()
+        self.created_at = time.time()
     
     def verify_password(self, password: str) -> bool:
-        """Verify password against hash"""
-        return pwd_context.verify(password, self.hashed_password)
+        """Verify password against hash (rehashes if the cost parameters changed)"""
+        try:
+            password_hasher.verify(self.hashed_password, password)
+        except (VerificationError, InvalidHash):
+            return False
+        if password_hasher.check_needs_rehash(self.hashed_password):
+            self.hashed_password = password_hasher.hash(password)
+        return True
     
     @staticmethod
     def hash_password(password: str) -> str:
         """Hash a password"""
-        # bcrypt has a 72 byte limit, truncate if necessary
-        password_bytes = password.encode('utf-8')
-        if len(password_bytes) > 72:
-            password = password_bytes[:72].decode('utf-8', errors='ignore')
-        return pwd_context.hash(password)
+        return password_hasher.hash(password)
 
 
 class OAuth2Client:
     """OAuth2 client model"""
+    __slots__ = ("client_id", "client_secret", "client_name", "redirect_uris", "scope",
+                 "grant_types", "response_types", "created_at")
+    
     def __init__(self, client_id: str, client_secret: str, client_name: str, 
-                 redirect_uris: List[str], scope: str = "openid profile email"):
+                 redirect_uris: Iterable[str], scope: str = "openid profile email"):
         self.client_id = client_id
         self.client_secret = client_secret
         self.client_name = client_name
-        self.redirect_uris = redirect_uris
+        self.redirect_uris = frozenset(redirect_uris)
         self.scope = scope
-        self.grant_types = ["authorization_code", "refresh_token"]
-        self.response_types = ["code"]
-        self.created_at = datetime.utcnow()
+        self.grant_types = _DEFAULT_GRANT_TYPES
+        self.response_types = _DEFAULT_RESPONSE_TYPES
+        self.created_at = time.time()
 
 
 class AuthorizationCode:
     """Authorization code model"""
+    __slots__ = ("code", "client_id", "user_id", "redirect_uri", "scope", "code_challenge",
+                 "code_challenge_method", "expires_at", "created_at")
+    
     def __init__(self, code: str, client_id: str, user_id: int, redirect_uri: str,
                  scope: str = "", expires_in_minutes: int = 10,
                  code_challenge: Optional[str] = None,
@@ -62,17 +107,21 @@ class AuthorizationCode:
         self.scope = scope
         self.code_challenge = code_challenge
         self.code_challenge_method = code_challenge_method
-        self.expires_at = datetime.utcnow() + timedelta(minutes=expires_in_minutes)
-        self.used = False
-        self.created_at = datetime.utcnow()
+        self.expires_at = monotonic_now() + expires_in_minutes * 60
+        self.created_at = time.time()
     
-    def is_expired(self) -> bool:
-        """Check if code is expired"""
-        return datetime.utcnow() > self.expires_at
+    def is_expired(self, now: Optional[float] = None) -> bool:
+        """Check if code is expired (now: time.monotonic() already taken by the caller)"""
+        if now is None:
+            now = monotonic_now()
+        return now > self.expires_at
 
 
 class Token:
     """Access and refresh token model"""
+    __slots__ = ("access_token", "refresh_token", "client_id", "user_id", "scope", "token_type",
+                 "issued_at", "access_token_expires_at", "refresh_token_expires_at", "revoked")
+    
     def __init__(self, access_token: str, client_id: str, user_id: int, 
                  scope: str = "", expires_in_seconds: int = 3600,
                  refresh_token: Optional[str] = None, refresh_expires_in_days: int = 30):
@@ -81,23 +130,28 @@ class Token:
         self.client_id = client_id
         self.user_id = user_id
         self.scope = scope
-        self.token_type = "Bearer"
-        self.issued_at = datetime.utcnow()
-        self.access_token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in_seconds)
+        self.token_type = _BEARER
+        # Wall-clock epoch seconds for timestamps; expiry deadlines are time.monotonic() seconds
+        self.issued_at = time.time()
+        self.access_token_expires_at = monotonic_now() + expires_in_seconds
         self.refresh_token_expires_at = None
         if refresh_token:
-            self.refresh_token_expires_at = datetime.utcnow() + timedelta(days=refresh_expires_in_days)
+            self.refresh_token_expires_at = monotonic_now() + refresh_expires_in_days * 86400
         self.revoked = False
     
-    def is_expired(self) -> bool:
+    def is_expired(self, now: Optional[float] = None) -> bool:
         """Check if access token is expired"""
-        return datetime.utcnow() > self.access_token_expires_at
+        if now is None:
+            now = monotonic_now()
+        return now > self.access_token_expires_at
     
-    def is_refresh_token_expired(self) -> bool:
+    def is_refresh_token_expired(self, now: Optional[float] = None) -> bool:
         """Check if refresh token is expired"""
-        if not self.refresh_token_expires_at:
+        if self.refresh_token_expires_at is None:
             return False
-        return datetime.utcnow() > self.refresh_token_expires_at
+        if now is None:
+            now = monotonic_now()
+        return now > self.refresh_token_expires_at
 
 
 class InMemoryStorage:
@@ -111,6 +165,10 @@ class InMemoryStorage:
         self.tokens: Dict[str, Token] = {}  # key: access_token
         self.tokens_by_refresh: Dict[str, Token] = {}  # key: refresh_token
         self._user_id_counter = 1
+        # Min-heaps of (monotonic deadline, key) so purge_expired never scans the dicts
+        self._code_expiry: List[Tuple[float, str]] = []
+        self._token_expiry: List[Tuple[float, str]] = []
+        self._refresh_expiry: List[Tuple[float, str]] = []
     
     # User methods
     def create_user(self, username: str, email: str, password: str, full_name: str = "") -> User:
@@ -135,7 +193,7 @@ class InMemoryStorage:
     
     # Client methods
     def create_client(self, client_id: str, client_secret: str, client_name: str,
-                     redirect_uris: List[str], scope: str = "openid profile email") -> OAuth2Client:
+                     redirect_uris: Iterable[str], scope: str = "openid profile email") -> OAuth2Client:
         """Create a new OAuth2 client"""
         client = OAuth2Client(client_id, client_secret, client_name, redirect_uris, scope)
         self.clients[client_id] = client
@@ -155,52 +213,70 @@ class InMemoryStorage:
         auth_code = AuthorizationCode(code, client_id, user_id, redirect_uri, scope, 
                                      expires_in_minutes, code_challenge, code_challenge_method)
         self.authorization_codes[code] = auth_code
+        heapq.heappush(self._code_expiry, (auth_code.expires_at, code))
         return auth_code
     
-    def get_authorization_code(self, code: str) -> Optional[AuthorizationCode]:
-        """Get authorization code"""
-        auth_code = self.authorization_codes.get(code)
-        if auth_code and not auth_code.is_expired() and not auth_code.used:
+    def consume_authorization_code(self, code: str, now: Optional[float] = None) -> Optional[AuthorizationCode]:
+        """Remove and return a valid authorization code (single use)"""
+        auth_code = self.authorization_codes.pop(code, None)
+        if auth_code and not auth_code.is_expired(now):
             return auth_code
         return None
     
-    def mark_code_as_used(self, code: str):
-        """Mark authorization code as used"""
-        if code in self.authorization_codes:
-            self.authorization_codes[code].used = True
-    
     # Token methods
     def create_token(self, client_id: str, user_id: int, scope: str = "",
                     expires_in_seconds: int = 3600, include_refresh_token: bool = True) -> Token:
         """Create a new token"""
-        access_token = secrets.token_urlsafe(32)
-        refresh_token = secrets.token_urlsafe(32) if include_refresh_token else None
+        # One OS CSPRNG read covers both the access and refresh token
+        raw = os.urandom(64 if include_refresh_token else 32)
+        access_token = _urlsafe(raw[:32])
+        refresh_token = _urlsafe(raw[32:]) if include_refresh_token else None
         
         token = Token(access_token, client_id, user_id, scope, expires_in_seconds, refresh_token)
         
         self.tokens[access_token] = token
+        heapq.heappush(self._token_expiry, (token.access_token_expires_at, access_token))
         if refresh_token:
             self.tokens_by_refresh[refresh_token] = token
+            heapq.heappush(self._refresh_expiry, (token.refresh_token_expires_at, refresh_token))
         
         return token
     
-    def get_token(self, access_token: str) -> Optional[Token]:
+    def get_token(self, access_token: str, now: Optional[float] = None) -> Optional[Token]:
         """Get token by access_token"""
         token = self.tokens.get(access_token)
-        if token and not token.is_expired() and not token.revoked:
+        if token and not token.is_expired(now) and not token.revoked:
             return token
         return None
     
-    def get_token_by_refresh(self, refresh_token: str) -> Optional[Token]:
-        """Get token by refresh_token"""
-        token = self.tokens_by_refresh.get(refresh_token)
-        if token and not token.is_refresh_token_expired() and not token.revoked:
+    def pop_refresh_token(self, refresh_token: str, now: Optional[float] = None) -> Optional[Token]:
+        """Remove and return the token for a valid refresh_token (single use)"""
+        token = self.tokens_by_refresh.pop(refresh_token, None)
+        if token and not token.is_refresh_token_expired(now) and not token.revoked:
             return token
         return None
     
     def revoke_token(self, token: Token):
         """Revoke a token"""
         token.revoked = True
+    
+    def purge_expired(self, now: Optional[float] = None) -> int:
+        """Drop expired codes and tokens; returns how many entries were removed"""
+        if now is None:
+            now = monotonic_now()
+        
+        removed = 0
+        for heap, index in (
+            (self._code_expiry, self.authorization_codes),
+            (self._token_expiry, self.tokens),
+            (self._refresh_expiry, self.tokens_by_refresh),
+        ):
+            while heap and heap[0][0] <= now:
+                _, key = heapq.heappop(heap)
+                # Already consumed entries are simply gone from the dict
+                if index.pop(key, None) is not None:
+                    removed += 1
+        return removed
 
 
 # Global storage instance
@@ -0,0 +1,137 @@
+"""
+Side-by-side check of WildcardCORSMiddleware against Starlette's CORSMiddleware
+(allow_origins=["*"], allow_credentials=True, allow_methods=["*"], allow_headers=["*"])
+
+Runs both middlewares over raw ASGI scopes, no server needed:
+    python test_cors.py
+"""
+import asyncio
+
+from starlette.middleware.cors import CORSMiddleware
+
+from cors import WildcardCORSMiddleware
+
+ORIGIN = b"https://chat.openai.com"
+
+# (name, method, request headers, headers the app responds with)
+CASES = [
+    ("no Origin", "GET", [], []),
+    ("simple request", "GET", [(b"origin", ORIGIN)], []),
+    ("simple request with cookie", "POST", [(b"origin", ORIGIN), (b"cookie", b"a=1")], []),
+    (
+        "cookie + app Vary",
+        "GET",
+        [(b"origin", ORIGIN), (b"cookie", b"a=1")],
+        [(b"vary", b"Accept-Encoding")],
+    ),
+    (
+        "app already sets CORS headers",
+        "GET",
+        [(b"origin", ORIGIN)],
+        [(b"access-control-allow-origin", b"https://other.example")],
+    ),
+    (
+        "duplicate Origin",
+        "GET",
+        [(b"origin", ORIGIN), (b"origin", b"https://evil.example"), (b"cookie", b"a=1")],
+        [],
+    ),
+    ("preflight", "OPTIONS", [(b"origin", ORIGIN), (b"access-control-request-method", b"POST")], []),
+    (
+        "preflight with headers",
+        "OPTIONS",
+        [
+            (b"origin", ORIGIN),
+            (b"access-control-request-method", b"POST"),
+            (b"access-control-request-headers", b"authorization, content-type"),
+        ],
+        [],
+    ),
+    (
+        "preflight with empty headers",
+        "OPTIONS",
+        [
+            (b"origin", ORIGIN),
+            (b"access-control-request-method", b"GET"),
+            (b"access-control-request-headers", b""),
+        ],
+        [],
+    ),
+    (
+        "preflight with disallowed method",
+        "OPTIONS",
+        [(b"origin", ORIGIN), (b"access-control-request-method", b"FOO")],
+        [],
+    ),
+    ("OPTIONS without request method", "OPTIONS", [(b"origin", ORIGIN)], []),
+]
+
+
+def make_app(response_headers):
+    """Plain ASGI app answering 200 "app" with the given headers"""
+    async def app(scope, receive, send):
+        headers = [(b"content-type", b"text/plain")] + list(response_headers)
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": b"app"})
+    return app
+
+
+async def run(middleware, method, request_headers):
+    """Call the middleware once and collect (status, headers, body)"""
+    scope = {
+        "type": "http",
+        "method": method,
+        "path": "/",
+        "query_string": b"",
+        "headers": request_headers,
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    await middleware(scope, receive, send)
+    start, body = messages[0], messages[1]
+    return start["status"], sorted(start["headers"]), body["body"]
+
+
+async def main():
+    print("=" * 60)
+    print("WildcardCORSMiddleware vs Starlette CORSMiddleware")
+    print("=" * 60)
+
+    failures = 0
+    for name, method, request_headers, response_headers in CASES:
+        app = make_app(response_headers)
+        starlette = CORSMiddleware(
+            app,
+            allow_origins=["*"],
+            allow_credentials=True,
+            allow_methods=["*"],
+            allow_headers=["*"],
+        )
+        expected = await run(starlette, method, request_headers)
+        actual = await run(WildcardCORSMiddleware(app), method, request_headers)
+
+        if actual == expected:
+            print(f"✅ {name}")
+        else:
+            failures += 1
+            print(f"❌ {name}")
+            print(f"   starlette: {expected}")
+            print(f"   wildcard:  {actual}")
+
+    print("\n" + "=" * 60)
+    if failures:
+        print(f"❌ {failures} case(s) differ")
+    else:
+        print("✅ All cases match!")
+    print("=" * 60)
+    return failures
+
+
+if __name__ == "__main__":
+    raise SystemExit(1 if asyncio.run(main()) else 0)
@@ -1,22 +1,33 @@
 """
 Test script for RFC 7591 Dynamic Client Registration
+(for faster local runs, start the server with ARGON2_TIME_COST=1 ARGON2_MEMORY_COST=1024)
+Requires httpx: pip install httpx
 """
-import requests
+import asyncio
+import httpx
 import json
 
 # Server URL (change this to your deployed URL)
 SERVER_URL = "http://localhost:8000"
 
-def test_oauth_metadata():
-    """Test OAuth metadata endpoint"""
+# Registration request (RFC 7591 format)
+REGISTRATION_DATA = {
+    "client_name": "ChatGPT Test Client",
+    "redirect_uris": [
+        "https://chat.openai.com/aip/callback",
+        "https://chatgpt.com/aip/callback"
+    ],
+    "grant_types": ["authorization_code", "refresh_token"],
+    "response_types": ["code"],
+    "token_endpoint_auth_method": "client_secret_basic",
+    "scope": "openid profile email"
+}
+
+
+def report_oauth_metadata(response):
+    """Check the OAuth metadata endpoint response"""
     print("\n🔍 Testing OAuth Metadata Endpoint...")
     print(f"GET {SERVER_URL}/.well-known/oauth-authorization-server")
-    
-    response = requests.get(
-        f"{SERVER_URL}/.well-known/oauth-authorization-server",
-        headers={"Accept": "application/json"}
-    )
-    
     print(f"Status: {response.status_code}")
     
     if response.status_code == 200:
@@ -36,35 +47,13 @@ def test_oauth_metadata():
         return None
 
 
-def test_dynamic_registration():
-    """Test dynamic client registration"""
+def report_dynamic_registration(response):
+    """Check the dynamic client registration response"""
     print("\n🔍 Testing Dynamic Client Registration...")
     print(f"POST {SERVER_URL}/register")
     
-    # Prepare registration request (RFC 7591 format)
-    registration_data = {
-        "client_name": "ChatGPT Test Client",
-        "redirect_uris": [
-            "https://chat.openai.com/aip/callback",
-            "https://chatgpt.com/aip/callback"
-        ],
-        "grant_types": ["authorization_code", "refresh_token"],
-        "response_types": ["code"],
-        "token_endpoint_auth_method": "client_secret_basic",
-        "scope": "openid profile email"
-    }
-    
     print("\nRequest body:")
-    print(json.dumps(registration_data, indent=2))
-    
-    response = requests.post(
-        f"{SERVER_URL}/register",
-        json=registration_data,
-        headers={
-            "Content-Type": "application/json",
-            "Accept": "application/json"
-        }
-    )
+    print(json.dumps(REGISTRATION_DATA, indent=2))
     
     print(f"\nStatus: {response.status_code}")
     
@@ -83,7 +72,7 @@ def test_dynamic_registration():
         return None
 
 
-def test_authorization_flow(client_info):
+async def test_authorization_flow(client, client_info):
     """Test that the registered client can start authorization flow"""
     if not client_info:
         print("\n⚠️  Skipping authorization flow test (no client info)")
@@ -91,22 +80,16 @@ def test_authorization_flow(client_info):
     
     print("\n🔍 Testing Authorization Flow with Registered Client...")
     
-    client_id = client_info.get("client_id")
-    redirect_uri = client_info.get("redirect_uris", [])[0]
-    
-    auth_url = (
-        f"{SERVER_URL}/authorize"
-        f"?client_id={client_id}"
-        f"&redirect_uri={redirect_uri}"
-        f"&response_type=code"
-        f"&scope=openid profile email"
-        f"&state=test_state_123"
-    )
+    response = await client.get("/authorize", params={
+        "client_id": client_info.get("client_id"),
+        "redirect_uri": client_info.get("redirect_uris", [])[0],
+        "response_type": "code",
+        "scope": "openid profile email",
+        "state": "test_state_123",
+    })
     
     print(f"\nAuthorization URL:")
-    print(auth_url)
-    
-    response = requests.get(auth_url, allow_redirects=False)
+    print(response.url)
     
     print(f"\nStatus: {response.status_code}")
     
@@ -118,19 +101,23 @@ def test_authorization_flow(client_info):
         print(response.text[:500])
 
 
-if __name__ == "__main__":
+async def main():
     print("=" * 60)
     print("RFC 7591 Dynamic Client Registration Test")
     print("=" * 60)
     
-    # Test 1: Check OAuth metadata
-    metadata = test_oauth_metadata()
-    
-    # Test 2: Register a new client dynamically
-    client_info = test_dynamic_registration()
-    
-    # Test 3: Try to use the registered client
-    test_authorization_flow(client_info)
+    headers = {"Accept": "application/json"}
+    async with httpx.AsyncClient(base_url=SERVER_URL) as client:
+        # Test 1 + 2: metadata probe and registration don't depend on each other
+        metadata_response, registration_response = await asyncio.gather(
+            client.get("/.well-known/oauth-authorization-server", headers=headers),
+            client.post("/register", json=REGISTRATION_DATA, headers=headers),
+        )
+        metadata = report_oauth_metadata(metadata_response)
+        client_info = report_dynamic_registration(registration_response)
+        
+        # Test 3: Try to use the registered client
+        await test_authorization_flow(client, client_info)
     
     print("\n" + "=" * 60)
     print("✅ All tests completed!")
@@ -140,3 +127,6 @@ if __name__ == "__main__":
         print("\n🎉 Your OAuth server now supports RFC 7591 Dynamic Client Registration!")
         print("   ChatGPT and other services can now register themselves automatically.")
 
+
+if __name__ == "__main__":
+    asyncio.run(main())
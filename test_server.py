@@ -1,10 +1,17 @@
 """
 Simple test script to verify OAuth server is working
 Run this after starting the server with: python main.py
+(for faster local runs: ARGON2_TIME_COST=1 ARGON2_MEMORY_COST=1024 python main.py)
 """
 import requests
+from requests.adapters import HTTPAdapter
 import sys
 
+# One keep-alive connection pool shared by every request in this script
+_session = requests.Session()
+_session.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=4))
+
 
 def test_server():
     """Test if server is running and responding"""
@@ -16,7 +23,7 @@ def test_server():
     # Test 1: Server is running
     print("\n1. Testing if server is running...")
     try:
-        response = requests.get(base_url, timeout=5)
+        response = _session.get(base_url, timeout=5)
         if response.status_code == 200:
             print("   ✅ Server is running")
         else:
@@ -32,7 +39,7 @@ def test_server():
     # Test 2: OAuth metadata endpoint
     print("\n2. Testing OAuth metadata endpoint...")
     try:
-        response = requests.get(f"{base_url}/.well-known/oauth-authorization-server")
+        response = _session.get(f"{base_url}/.well-known/oauth-authorization-server")
         if response.status_code == 200:
             metadata = response.json()
             print("   ✅ OAuth metadata endpoint working")
@@ -52,7 +59,7 @@ def test_server():
             "redirect_uris": "http://localhost:3000/callback",
             "scope": "openid profile email"
         }
-        response = requests.post(f"{base_url}/register-client", data=data)
+        response = _session.post(f"{base_url}/register-client", data=data)
         if response.status_code == 200:
             client_data = response.json()
             print("   ✅ Client registration working")
@@ -81,7 +88,7 @@ def test_authorization_endpoint():
             "scope": "openid profile email",
             "state": "test123"
         }
-        response = requests.get(f"{base_url}/authorize", params=params)
+        response = _session.get(f"{base_url}/authorize", params=params)
         if response.status_code == 200 and "Authorization Required" in response.text:
             print("   ✅ Authorization endpoint working")
             print("   - Login page is accessible")